@@ -1,4 +1,5 @@
-from copy import deepcopy
+import functools
+import operator
 import os
 from typing import Any, List, Optional, Union
 import warnings
@@ -7,10 +8,34 @@ import numpy as np
 import pandas as pd
 from scipy import stats
 
-from bokeh.models import ColorBar, ColumnDataSource, LabelSet
-from bokeh.models import LinearColorMapper, FactorRange
-from bokeh.palettes import Magma
-from bokeh.plotting import figure, output_file, save
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+_SERIES = pd.Series
+_FRAME = pd.DataFrame
+_SERIES_OR_FRAME = (pd.Series, pd.DataFrame)
+_FLOAT_TYPES = (float, np.floating)
+
+if njit is not None:
+    @njit(
+        'void(float64[::1], float64[::1])',
+        cache=True,
+        parallel=True,
+        fastmath=True
+    )
+    def _augment_kernel(target: np.ndarray, out: np.ndarray) -> None:
+        num_values = target.shape[0]
+        for i in prange(num_values):
+            value = np.log2(target[i] + 1.0)
+            out[i] = value
+            out[i + num_values] = -value
+else:
+    def _augment_kernel(target: np.ndarray, out: np.ndarray) -> None:
+        num_values = target.shape[0]
+        np.log2(target + 1, out=out[:num_values])
+        np.negative(out[:num_values], out=out[num_values:])
 
 def augment_data(
     target: np.ndarray, 
@@ -35,17 +60,24 @@ def augment_data(
 
     """
     target = target.reshape(-1)
-    if np.isclose(np.mean(target), 0):
+    num_values = target.size
+    if warn and abs(target.sum(dtype=np.float64)) < 1e-8 * num_values:
         message = f'{name} has already been centered.'
+        warnings.warn(message, RuntimeWarning)
+
+    minimum = np.min(target)
+    maximum = np.max(target)
+
+    out = np.empty(2 * num_values, dtype=np.float64)
+    if maximum < 100 and minimum < 0:
         if warn:
+            message = f'{name} might already been log-transformed. Ignore it.'
             warnings.warn(message, RuntimeWarning)
-    if np.max(target) < 100 and np.min(target) < 0:
-        message = f'{name} might already been log-transformed. Ignore it.'
-        if warn:
-            warnings.warn(message, RuntimeWarning)
+        out[:num_values] = target
+        np.negative(out[:num_values], out=out[num_values:])
     else:
-        target = np.log2(target + 1)
-    return np.concatenate([target, -1 * target])
+        _augment_kernel(np.ascontiguousarray(target, dtype=np.float64), out)
+    return out
 
 def is_integer(
     target: Any,
@@ -73,28 +105,32 @@ def is_integer(
             Whether target is an integer
 
     """
-    dtype: type = type(target)
-    if isinstance(target, int) or np.issubdtype(dtype, np.integer):
+    try:
+        operator.index(target)
         return True
-    elif isinstance(target, float) or np.issubdtype(dtype, np.inexact):
-        if target.is_integer():
+    except TypeError:
+        pass
+    if isinstance(target, _FLOAT_TYPES):
+        if float(target).is_integer():
             return True
         else:
-            message = f'{name} should be an integer, got value:{target}'
+            if warn or error:
+                message = f'{name} should be an integer, got value:{target}'
+                if warn:
+                    warnings.warn(message, RuntimeWarning)
+                if error:
+                    raise ValueError(message)
+            return False
+    else:
+        if warn or error:
+            message = ''.join((
+                f'{name} should be an integer or float number, ',
+                f'got type: {type(target).__name__}'
+            ))
             if warn:
                 warnings.warn(message, RuntimeWarning)
             if error:
-                raise ValueError(message)
-            return False
-    else:
-        message = ''.join((
-            f'{name} should be an integer or float number, ',
-            f'got type: {dtype.__name__}'
-        ))
-        if warn:
-            warnings.warn(message, RuntimeWarning)
-        if error:
-            raise TypeError(message)
+                raise TypeError(message)
         return False
 
 def is_positive_integer(
@@ -127,13 +163,63 @@ def is_positive_integer(
         if x > 0:
             return True
         else:
-            message = f'{name} should be an positive integer, got value:{x}'
+            if warn or error:
+                message = f'{name} should be an positive integer, got value:{x}'
+                if warn:
+                    warnings.warn(message, RuntimeWarning)
+                if error:
+                    raise ValueError(message)
+            return False
+    return False
+
+def is_positive_integer_array(
+    target: Any,
+    name: str = 'variable',
+    warn: bool = False,
+    error: bool = False
+) -> bool:
+    """Check if target is an array of positive integers.
+
+    Parameters:
+        target: Any (required)
+            Input variable.
+
+        name: str, default: 'variable' (optional)
+            The name of the variable (used in warning message).
+
+        warn: bool, default: False
+            Enable warning message.
+
+        error: bool, default False
+            Enable raising error.
+
+    Returns:
+        bool
+            Whether target is an array of positive integers.
+
+    """
+    target = np.asarray(target)
+    if not np.issubdtype(target.dtype, np.number):
+        if warn or error:
+            message = ''.join((
+                f'{name} should be an array of numbers, ',
+                f'got dtype: {target.dtype}'
+            ))
+            if warn:
+                warnings.warn(message, RuntimeWarning)
+            if error:
+                raise TypeError(message)
+        return False
+    if bool(np.all(target > 0) and np.all(np.mod(target, 1) == 0)):
+        return True
+    else:
+        if warn or error:
+            message = f'{name} should only contain positive integers.'
             if warn:
                 warnings.warn(message, RuntimeWarning)
             if error:
                 raise ValueError(message)
-            return False
-    return False
+        return False
 
 def is_1darray(
     target: Any,
@@ -161,33 +247,45 @@ def is_1darray(
             Whether target is an one dimensional list or numpy.ndarray.
 
     """
-    target = deepcopy(target)
-    if isinstance(target, pd.core.series.Series):
+    if isinstance(target, _SERIES):
         return True
     elif isinstance(target, list) or isinstance(target, np.ndarray):
         if isinstance(target, list):
-            target = np.array(target)
+            ndim = 2 if any(
+                isinstance(x, (list, tuple, np.ndarray)) for x in target
+            ) else 1
+        else:
+            ndim = target.ndim
 
-        if target.ndim == 1:
+        if ndim == 1:
             return True
         else:
-            message = f'{name} should have dim = 1, got dim = {target.ndim}'
+            if warn or error:
+                message = f'{name} should have dim = 1, got dim = {ndim}'
+                if warn:
+                    warnings.warn(message, RuntimeWarning)
+                if error:
+                    raise ValueError(message)
+            return False
+    else:
+        if warn or error:
+            message = ''.join((
+                f'{name} should be an instance of list or numpy.ndarray, ',
+                f'got type: {type(target).__name__}.'
+            ))
             if warn:
                 warnings.warn(message, RuntimeWarning)
             if error:
-                raise ValueError(message)
-            return False
-    else:
-        message = ''.join((
-            f'{name} should be an instance of list or numpy.ndarray, ',
-            f'got type: {type(target).__name__}.'
-        ))
-        if warn:
-            warnings.warn(message, RuntimeWarning)
-        if error:
-            raise TypeError(message)
+                raise TypeError(message)
         return False
 
+@functools.lru_cache(maxsize=1024)
+def _resolve_and_check(path: str) -> Optional[str]:
+    resolved = os.path.realpath(path)
+    if os.path.isfile(resolved):
+        return resolved
+    return None
+
 def is_file(
     target: str,
     name: str = 'variable',
@@ -215,21 +313,25 @@ def is_file(
 
     """
     if isinstance(target, str):
-        path: str = os.path.realpath(target)
-        if os.path.isfile(path):
+        path: Optional[str] = _resolve_and_check(target)
+        if path is not None:
             return True
         else:
-            message = f'{path} does not exist.'
+            message = f'{os.path.realpath(target)} does not exist.'
             if warn:
                 warnings.warn(f'{message} Ignore it.', RuntimeWarning)
             else:
                 raise TypeError(message)
     else:
-        message = f'{name} should be an instance of str, got {type(target).__name__}.'
-        if warn:
-            warnings.warn(f'{message} Ignore it.', RuntimeWarning)
-        if error:
-            raise TypeError(message)
+        if warn or error:
+            message = ''.join((
+                f'{name} should be an instance of str, ',
+                f'got {type(target).__name__}.'
+            ))
+            if warn:
+                warnings.warn(f'{message} Ignore it.', RuntimeWarning)
+            if error:
+                raise TypeError(message)
         return False
 
 def is_series_dataframe(
@@ -260,15 +362,16 @@ def is_series_dataframe(
             pandas.core.frame.Dataframe
 
     """
-    if not isinstance(target, (pd.core.series.Series, pd.core.frame.DataFrame)):
-        message = ''.join((
-            f'{name} should be an instance of pd.core.series.Series or ',
-            'pd.core.frame.DataFrame.'
-        ))
-        if warn:
-            warnings.warn(f'{message} Ignore it.', RuntimeWarning)
-        if error:
-            raise TypeError(message)
+    if not isinstance(target, _SERIES_OR_FRAME):
+        if warn or error:
+            message = ''.join((
+                f'{name} should be an instance of pd.core.series.Series or ',
+                'pd.core.frame.DataFrame.'
+            ))
+            if warn:
+                warnings.warn(f'{message} Ignore it.', RuntimeWarning)
+            if error:
+                raise TypeError(message)
         return False
     return True
 
@@ -310,16 +413,20 @@ def have_same_index(
         is_series_dataframe(target, target_name, warn, error) and
         is_series_dataframe(source, source_name, warn, error)
     ):
-        if set(target.index) == set(source.index):
+        if (
+            target.index.equals(source.index) or
+            target.index.symmetric_difference(source.index).empty
+        ):
             return True
         else:
-            message = ''.join((
-                f"{target_name} and {source_name} don't share the same index."
-            ))
-            if warn:
-                warnings.warn(f'{message} Ignore it.', RuntimeWarning)
-            if error:
-                raise ValueError(message)
+            if warn or error:
+                message = ''.join((
+                    f"{target_name} and {source_name} don't share the same index."
+                ))
+                if warn:
+                    warnings.warn(f'{message} Ignore it.', RuntimeWarning)
+                if error:
+                    raise ValueError(message)
     else:
         return False
 
@@ -346,22 +453,24 @@ def read_series(
             The resulting pd.core.series.Series or None if the file cannot be loaded.
 
     """
-    if isinstance(target, pd.Series):
+    if isinstance(target, _SERIES):
         return target
     elif is_file(target):
         return pd.read_csv(
-            os.path.realpath(target),
+            _resolve_and_check(target),
             sep='\t',
             index_col=0,
             header=None,
-            squeeze=True
-        )
+            engine='c',
+            memory_map=True
+        ).iloc[:, 0]
     else:
-        message = f'{target} does not exist.'
-        if warn:
-            warnings.warn(f'{message} Ignore it.', RuntimeWarning)
-        if error:
-            raise FileNotFoundError(message)
+        if warn or error:
+            message = f'{target} does not exist.'
+            if warn:
+                warnings.warn(f'{message} Ignore it.', RuntimeWarning)
+            if error:
+                raise FileNotFoundError(message)
         return None
 
 def reduce_data(target: np.ndarray, axis=0) -> np.ndarray:
@@ -379,7 +488,10 @@ def reduce_data(target: np.ndarray, axis=0) -> np.ndarray:
             Return the reduced (the first half) data.
 
     """
-    return np.split(target, 2, axis=axis)[0]
+    half = target.shape[axis] // 2
+    slicer = [slice(None)] * target.ndim
+    slicer[axis] = slice(0, half)
+    return target[tuple(slicer)]
 
 def likelihood_ratio_test(
     log_likelihood_simplified: np.float32,
@@ -404,24 +516,61 @@ def likelihood_ratio_test(
 
     """
     likelihood_ratio = 2 * (log_likelihood_complex - log_likelihood_simplified)
+    return _chi2_sf(round(float(likelihood_ratio), 6), df)
+
+@functools.lru_cache(maxsize=4096)
+def _chi2_sf(likelihood_ratio: float, df: int) -> float:
     return stats.chi2.sf(likelihood_ratio, df)
 
-def get_random_state(seed: Optional[int] = None) -> np.random.mtrand.RandomState:
-    """Return numpy random state based on the given seed.
+def likelihood_ratio_test_batch(
+    log_likelihood_simplified: np.ndarray,
+    log_likelihood_complex: np.ndarray,
+    df: int = 4
+) -> np.ndarray:
+    """Return the pvalues of likelihood ratio tests for a batch of models.
+
+    Parameters:
+        log_likelihood_simplifed: numpy.ndarray (required)
+            The log likelihoods of the simplified models.
+
+        log_likelihood_complex: numpy.ndarray (required)
+            The log likelihoods of the complex models.
+
+        df: int, default: 4 (optional)
+            The degree of freedom.
+
+    Returns:
+        numpy.ndarray
+            The pvalues of the likelihood ratio tests.
+
+    """
+    likelihood_ratio = 2 * (
+        np.asarray(log_likelihood_complex) - np.asarray(log_likelihood_simplified)
+    )
+    return stats.chi2.sf(likelihood_ratio, df)
+
+def get_random_state(
+    seed: Optional[int] = None,
+    legacy: bool = False
+) -> Union[np.random.Generator, np.random.RandomState]:
+    """Return numpy random generator based on the given seed.
 
     Parameters:
         seed: int, optional
             Random seed for sampling algorithm.
 
+        legacy: bool, default: False
+            Return the legacy np.random.RandomState (MT19937) instead of the
+            faster np.random.Generator (PCG64).
+
     Returns:
-        np.random.mtrand.RandomState
+        Union[np.random.Generator, np.random.RandomState]
             Number of methods for generating random numbers.
 
     """
-    if isinstance(seed, int):
+    if legacy:
         return np.random.RandomState(seed)
-    else:
-        return np.random.default_rng()
+    return np.random.default_rng(seed)
 
 def bokeh_affected_barplot(
     dataset,
@@ -445,17 +594,22 @@ def bokeh_affected_barplot(
         None
 
     """
+    from bokeh.models import ColumnDataSource, FactorRange
+    from bokeh.plotting import figure, output_file, save
+
     directory = os.path.realpath(outdir)
     os.makedirs(directory, exist_ok=True)
-    
+
     figure_table = qstat.num_affected_genes / dataset.num_genes * 100
     figure_table.index.names = ['0', '1']
     figure_table = figure_table.reset_index()
     figure_table.columns = ['sample_group', 'sample', '%']
 
-    y_data = list(zip(figure_table['sample_group'], figure_table['sample']))
-    y_uniq = list(set(y_data))
-    x_data = figure_table['%']
+    y_data = list(map(tuple, figure_table[['sample_group', 'sample']].to_numpy()))
+    y_uniq = pd.MultiIndex.from_frame(
+        figure_table[['sample_group', 'sample']]
+    ).unique().tolist()
+    x_data = figure_table['%'].to_numpy()
 
     data_source = ColumnDataSource(
         data=dict(
@@ -464,10 +618,12 @@ def bokeh_affected_barplot(
         )
     )
 
+    y_range = FactorRange(factors=y_uniq)
+
     fig = figure(
         title='',
         x_range=(0.0, 100.0),
-        y_range=FactorRange(*y_uniq),
+        y_range=y_range,
         width=960,
         height=len(figure_table['sample'].unique()) * 30,
         tooltips=[
@@ -498,6 +654,11 @@ def bokeh_affected_barplot(
     output_file(file_name, title=title)
     save(fig)
 
+@functools.lru_cache(maxsize=None)
+def _magma_palette() -> List[str]:
+    from bokeh.palettes import Magma
+    return list(Magma[256])[256:128:-1]
+
 def bokeh_affected_heatmap(
     dataset,
     qstat,
@@ -531,49 +692,61 @@ def bokeh_affected_heatmap(
         None.
 
     """
+    from bokeh.models import ColorBar, ColumnDataSource, LabelSet
+    from bokeh.models import LinearColorMapper, FactorRange
+    from bokeh.plotting import figure, output_file, save
+
     directory = os.path.realpath(outdir)
     os.makedirs(directory, exist_ok=True)
 
     groups = dataset.get_groups()
 
-    figure_table = qstat.affected_genes_each_sample.copy()
-    figure_table.columns = qstat.affected_genes_each_sample.columns.droplevel('Group')
+    figure_table = qstat.affected_genes_each_sample.droplevel('Group', axis=1)
     if genes is not None:
         figure_table = figure_table.loc[genes]
     if samples is not None:
         figure_table = figure_table[samples]
-    figure_table = figure_table.stack()
 
-    figure_table.index.names = ['0', '1']
-    figure_table = figure_table.reset_index()
-    figure_table.columns = ['gene', 'sample', 'affected']
-    figure_table['affected'] = figure_table['affected'].astype(int)
+    num_genes, num_samples = figure_table.shape
+    gene_values = np.repeat(figure_table.index.to_numpy(), num_samples)
+    sample_values = np.tile(figure_table.columns.to_numpy(), num_genes)
+    affected_values = figure_table.to_numpy().ravel().astype(np.int8)
 
+    figure_table = pd.DataFrame({
+        'gene': gene_values,
+        'sample': sample_values,
+        'affected': affected_values
+    })
     figure_table.loc[:, 'sample_group'] = groups[figure_table['sample']].values
-    figure_table.loc[:, 'color'] = '#000000'
-    figure_table.loc[figure_table['affected'] == 1.0, 'color'] = '#FFFFFF'
+    figure_table.loc[:, 'color'] = np.where(
+        affected_values == 1, '#FFFFFF', '#000000'
+    )
 
-    x_data = list(figure_table['sample'])
-    x_uniq = list(set(x_data))
-    y_data = figure_table['gene']
-    y_uniq = list(set(y_data))
+    x_data = figure_table['sample'].to_numpy()
+    x_uniq = pd.unique(x_data).tolist()
+    y_data = figure_table['gene'].to_numpy()
+    y_uniq = pd.unique(y_data).tolist()
 
-    mapper = LinearColorMapper(palette=list(Magma[256])[256:128:-1], low=0, high=1)
+    mapper = LinearColorMapper(palette=_magma_palette(), low=0, high=1)
 
     data_source = ColumnDataSource(
         data=dict(
             sample=x_data,
             gene=y_data,
-            affected=figure_table.affected
+            affected=figure_table['affected'].to_numpy(),
+            color=figure_table['color'].to_numpy()
         )
     )
 
+    x_range = FactorRange(factors=x_uniq)
+    y_range = FactorRange(factors=y_uniq)
+
     fig = figure(
         title='',
         x_axis_location="below",
         tools="hover, save",
-        x_range=FactorRange(*x_uniq),
-        y_range=FactorRange(*y_uniq),
+        x_range=x_range,
+        y_range=y_range,
         tooltips=[
             ('sample', '@sample'),
             ('gene', '@gene'),